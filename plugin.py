@@ -1,15 +1,69 @@
 from __future__ import annotations
 import asyncio
+import functools
 import os
+import pickle
 import re
+import shlex
 import subprocess
+import sys
+import time
 
 import sublime
 import sublime_aio
 
-from itertools import chain
+from collections import OrderedDict
 from pathlib import Path
 
+if sublime.platform() == "windows":
+    # creates overlapped pipes, required by asyncio's proactor event loop
+    from asyncio.windows_utils import Popen
+else:
+    from subprocess import Popen
+
+CACHE_SIZE = 256
+"""Maximum number of command outputs to keep in cache."""
+
+OUTPUT_CACHE = OrderedDict()
+"""LRU cache of recent command outputs, mapping (cmd, cwd) to (expiry time, output)."""
+
+SECTION_SEPARATOR = "__BASH_COMPLETIONS_SECTION__"
+"""Line printed after each command's output to split combined shell output."""
+
+END_MARKER = "__BASH_COMPLETIONS_END__"
+"""Line printed by a long-lived shell after all commands of a request are done."""
+
+OUTPUT_LIMIT = 256 * 1024
+"""Maximum number of bytes to read from a long-lived shell per request."""
+
+MAX_SHELLS = 4
+"""Maximum number of long-lived shells to keep running."""
+
+SHELLS = OrderedDict()
+"""Long-lived shells, mapping (shell, cwd) to BashShell."""
+
+INFLIGHT = {}
+"""Running shell requests, mapping (commands, cwd) to their task."""
+
+COMMAND_KIND = (sublime.KindId.FUNCTION, "f", "command")
+FILE_KIND = (sublime.KindId.NAMESPACE, "f", "filesystem")
+VARIABLE_KIND = (sublime.KindId.VARIABLE, "v", "Variable")
+
+MAX_FILES = 500
+"""Maximum number of folders and files to provide completions for."""
+
+WINDOWS_BASH = None
+"""Path of bash found on Windows, `False` if not found or `None` if not searched."""
+
+WORD_SEPARATOR_RE = re.compile(r"(?<!\\)[|&<>()\s]")
+"""Unescaped characters separating shell words."""
+
+UNESCAPE_RE = re.compile(r"\\(.)")
+"""Backslash escaped characters within shell words."""
+
+VARIABLE_RE = re.compile(r"\$(?:\{([A-Za-z_]\w*)\}|([A-Za-z_]\w*)(?=\W))(.*)", re.DOTALL)
+"""Shell word starting with a complete variable, like `${NAME}` or `$NAME/`."""
+
 
 def plugin_loaded():
     """
@@ -17,25 +71,372 @@ def plugin_loaded():
     of ST's ShellScript package. It contains keywords, built-in commands and
     variables, which don't need to be provided by this plugin and would
     otherwise cause duplicates.
+
+    The list is cached on disk and only regenerated, if ST's version or
+    the set of completion files has changed.
     """
     global KNOWN_COMPLETIONS
-    KNOWN_COMPLETIONS = set()
 
-    for res in sublime.find_resources("*.sublime-completions"):
-        if res.startswith("Packages/ShellScript/"):
+    # only ShellScript package's resources are relevant
+    resources = tuple(
+        res for res in sublime.find_resources("*.sublime-completions")
+        if res.startswith("Packages/ShellScript/")
+    )
+
+    # identifies completion files the cache was created from without loading them
+    key = (sublime.version(), resources)
+
+    cache_file = Path(sublime.cache_path(), __package__, "known_completions.pickle")
+
+    known = None
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, cached_known = pickle.load(f)
+            if (
+                cached_key == key
+                and isinstance(cached_known, (set, frozenset))
+                and all(isinstance(word, str) for word in cached_known)
+            ):
+                known = cached_known
+    except Exception:
+        # missing or corrupted cache, which may raise almost anything
+        pass
+
+    if known is None:
+        known = set()
+
+        for res in resources:
             data = sublime.decode_value(sublime.load_resource(res))
-            if data:
-                if sublime.score_selector("source.shell.bash", data["scope"].split(" ", 1)[0]) > 0:
-                    for item in data["completions"]:
-                        trigger = item.get("trigger")
-                        if trigger:
-                            KNOWN_COMPLETIONS.add(trigger)
-                        else:
-                            KNOWN_COMPLETIONS.add(str(item))
+            if not data:
+                continue
+
+            # common case doesn't need to be scored by ST's API
+            scope = data["scope"].split(" ", 1)[0]
+            if scope != "source.shell.bash" and sublime.score_selector("source.shell.bash", scope) <= 0:
+                continue
+
+            for item in data["completions"]:
+                trigger = item.get("trigger")
+                if trigger:
+                    known.add(trigger)
+                else:
+                    known.add(str(item))
+
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "wb") as f:
+                pickle.dump((key, known), f)
+        except OSError as e:
+            print(f"Failed to cache known completions: {e}")
+
+    # immutable set of interned strings for fast lookups
+    KNOWN_COMPLETIONS = frozenset(map(sys.intern, known))
+
+    if sublime.platform() == "windows":
+        # search bash in background, before the first view needs it
+        sublime.set_timeout_async(find_windows_bash)
+
+
+def plugin_unloaded():
+    """
+    Terminate all long-lived shells.
+    """
+    while SHELLS:
+        _, shell = SHELLS.popitem()
+        shell.kill(wait=True)
+
+
+def find_windows_bash():
+    """
+    Search bash on various default paths on Windows.
+
+    The result is cached, so paths are checked only once.
+
+    :returns:
+        The path of bash executable or `False` if not found.
+    """
+    global WINDOWS_BASH
+    if WINDOWS_BASH is None:
+        found = False
+
+        for fname in (
+            "$HOMEDRIVE\\cygwin64\\bin\\bash.exe",
+            "$HOMEDRIVE\\cygwin\\bin\\bash.exe",
+            "$HOMEDRIVE\\mingw64\\bin\\bash.exe",
+            "$HOMEDRIVE\\mingw\\bin\\bash.exe",
+            "$PROGRAMFILES\\Git\\bin\\bash.exe",
+            "$SYSTEMROOT\\System32\\bash.exe"  # uses WSL as last option
+        ):
+            fname = sublime.expand_variables(fname, os.environ)
+            if fname and os.path.exists(fname):
+                found = fname
+                break
+
+        WINDOWS_BASH = found
+
+    return WINDOWS_BASH
+
+
+def new_words(text: str):
+    """
+    Yield unique words of `compgen` output,
+    which are not already provided by static completions.
+    """
+    known = KNOWN_COMPLETIONS
+    seen = set()
+    for word in text.split("\n"):
+        if word and word not in known and word not in seen:
+            seen.add(word)
+            yield word
+
+
+async def run_commands(bash: BashShell, cmds: dict[str, float]):
+    """
+    Run commands at once in given long-lived shell and cache their outputs.
+
+    Outputs are cached even if all callers have lost interest meanwhile.
+    If shell output was truncated, the incomplete output of the last command
+    is returned but not cached and outputs of remaining commands are missing.
+
+    :param bash:
+        The shell to run commands in.
+    :param cmds:
+        The commands to run, mapped to the number of seconds
+        their output remains valid in cache.
+
+    :returns:
+        A dictionary of commands and their output strings from stdout.
+    """
+    # terminate each command's output by a separator line
+    script = "; ".join(f"{cmd}; echo {SECTION_SEPARATOR}" for cmd in cmds)
+
+    stdout, complete = await bash.run(script, timeout=10.0)
+
+    outputs = {}
+    sections = stdout.split(f"{SECTION_SEPARATOR}\n")
+    now = time.monotonic()
+
+    for cmd, text in zip(cmds, sections):
+        text = text.strip()
+        outputs[cmd] = text
+        if not complete and len(outputs) == len(sections):
+            # last section of truncated output is incomplete
+            break
+
+        key = (cmd, bash.cwd)
+        OUTPUT_CACHE[key] = (now + cmds[cmd], text)
+        OUTPUT_CACHE.move_to_end(key)
+
+    while len(OUTPUT_CACHE) > CACHE_SIZE:
+        OUTPUT_CACHE.popitem(last=False)
+
+    return outputs
+
+
+def quote_word(word: str) -> str:
+    """
+    Quote shell word to prevent it from being interpreted as shell code
+    or compgen options, but keep a leading variable being expanded.
+
+    Escapes are removed, as quoting would otherwise pass them literally.
+
+    :param word:
+        The shell word to quote.
+
+    :returns:
+        The quoted shell word, like `"${HOME}"'/Do'` for `$HOME/Do`.
+    """
+    match = VARIABLE_RE.match(word)
+    if match:
+        name = match.group(1) or match.group(2)
+        return f'"${{{name}}}"' + shlex.quote(UNESCAPE_RE.sub(r"\1", match.group(3)))
+
+    return shlex.quote(UNESCAPE_RE.sub(r"\1", word))
+
+
+def get_shell(shell: str, cwd: Path | None, startupinfo=None):
+    """
+    Return long-lived shell for given interpreter and working directory.
+
+    Least recently used shells are terminated, if too many are running.
+    """
+    key = (shell, cwd)
+    bash = SHELLS.get(key)
+    if bash:
+        SHELLS.move_to_end(key)
+        return bash
+
+    bash = SHELLS[key] = BashShell(shell, cwd, startupinfo)
+    while len(SHELLS) > MAX_SHELLS:
+        _, old = SHELLS.popitem(last=False)
+        old.kill()
+
+    return bash
+
+
+class BashShell:
+    """
+    A long-lived login shell, which reads commands from stdin.
+
+    It avoids spawning and initializing a new login shell per request.
+    The process is started lazily and restarted, if it died.
+    """
+
+    def __init__(self, shell: str, cwd: Path | None, startupinfo=None):
+        self.shell = shell
+        self.cwd = cwd
+        self.startupinfo = startupinfo
+        self.proc = None
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def start(self):
+        """
+        Start the shell process and connect its stdin/stdout pipes.
+
+        `Popen()` blocks until the child process has called `execve()`, which
+        may take a while on busy systems. It is therefore run in a worker
+        thread to keep the event loop responsive.
+        """
+        loop = asyncio.get_running_loop()
+
+        self.proc = await loop.run_in_executor(
+            None,
+            functools.partial(
+                Popen,
+                [self.shell, "-l"],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                startupinfo=self.startupinfo
+            )
+        )
+
+        self.reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(self.reader),
+            self.proc.stdout
+        )
+
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin,
+            self.proc.stdin
+        )
+        self.writer = asyncio.StreamWriter(transport, protocol, self.reader, loop)
+
+    async def run(self, script: str, timeout: float) -> tuple[str, bool]:
+        """
+        Run script and return its output.
+
+        Requests are serialized as they share the same stdin/stdout pipes.
+        The process is killed, if a request fails to complete.
+
+        :param script:
+            The commands to run.
+        :param timeout:
+            The number of seconds to wait for the script to complete.
+
+        :returns:
+            A tuple of output string from stdout and a flag,
+            which is `False` if output was truncated due to `OUTPUT_LIMIT`.
+        """
+        async with self.lock:
+            try:
+                if self.proc is None or self.proc.poll() is not None:
+                    await self.start()
+
+                # keep pipes, if the shell is killed meanwhile, so reading hits EOF
+                reader, writer = self.reader, self.writer
+
+                writer.write(f"{script}; echo {END_MARKER}\n".encode("utf-8"))
+                await writer.drain()
+                stdout, complete = await asyncio.wait_for(
+                    self.read_until(reader, f"{END_MARKER}\n".encode("utf-8")),
+                    timeout=timeout
+                )
+            except BaseException:
+                # output may be out of sync, start over next time
+                self.kill()
+                raise
+
+        return str(stdout, "utf-8", errors="replace"), complete
+
+    async def read_until(
+        self,
+        reader: asyncio.StreamReader,
+        marker: bytes
+    ) -> tuple[bytes, bool]:
+        """
+        Read output until marker line, but keep at most `OUTPUT_LIMIT` bytes.
+
+        Output exceeding the limit is read and discarded up to the marker,
+        so the shell remains in sync for the next request.
+
+        :param reader:
+            The stream to read shell output from.
+        :param marker:
+            The line terminating the output.
+
+        :returns:
+            A tuple of output without marker and a flag, which is `False`
+            if output was truncated to complete lines due to the limit.
+        """
+        buf = bytearray()
+        while len(buf) <= OUTPUT_LIMIT:
+            if buf.endswith(marker):
+                return bytes(buf[:-len(marker)]), True
+
+            chunk = await reader.read(64 * 1024)
+            if not chunk:
+                raise asyncio.IncompleteReadError(bytes(buf), None)
+
+            buf += chunk
+
+        tail = bytes(buf[-len(marker):])
+        while not tail.endswith(marker):
+            chunk = await reader.read(64 * 1024)
+            if not chunk:
+                raise asyncio.IncompleteReadError(tail, None)
+
+            tail = (tail + chunk)[-len(marker):]
+
+        return bytes(buf[:buf.rfind(b"\n", 0, OUTPUT_LIMIT) + 1]), False
+
+    def kill(self, wait: bool=False):
+        """
+        Kill the shell process, if running.
+
+        Pipe transports close themselves as soon as the process is gone.
+
+        :param wait:
+            If `True`, reap the process synchronously, otherwise in a worker
+            thread of the running event loop.
+        """
+        proc = self.proc
+        self.proc = None
+        self.reader = None
+        self.writer = None
+
+        if proc and proc.poll() is None:
+            try:
+                proc.kill()
+            except OSError:
+                return
+
+            # reap the process, which exits immediately
+            if wait:
+                try:
+                    proc.wait(timeout=1.0)
+                except subprocess.TimeoutExpired:
+                    pass
+            else:
+                asyncio.get_running_loop().run_in_executor(None, proc.wait)
 
 
 class BashCompletionListener(sublime_aio.ViewEventListener):
-    found_shell=None
+    # the view's pending completion request
+    task = None
 
     startupinfo = None
     if sublime.platform() == "windows":
@@ -43,6 +444,34 @@ class BashCompletionListener(sublime_aio.ViewEventListener):
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
         startupinfo.wShowWindow = subprocess.SW_HIDE
 
+    def __init__(self, view: sublime.View):
+        super().__init__(view)
+        self.load_selectors()
+
+    def load_selectors(self):
+        """
+        Read completion selectors from view's settings.
+
+        They are cached per view, so they needn't be looked up per request.
+        """
+        settings = self.view.settings()
+        self.completion_selector = settings.get(
+            "shell.bash.completion_selector",
+            "source.shell - comment - string.quoted"
+        )
+        self.command_completion_selector = settings.get(
+            "shell.bash.command_completion_selector",
+            "meta.function-call.identifier"
+        )
+        self.file_completion_selector = settings.get(
+            "shell.bash.file_completion_selector",
+            "- meta.function-call.identifier"
+        )
+        self.variable_completion_selector = settings.get(
+            "shell.bash.variable_completion_selector",
+            ""
+        )
+
     @classmethod
     def applies_to_primary_view_only(cls):
         return False
@@ -56,7 +485,7 @@ class BashCompletionListener(sublime_aio.ViewEventListener):
         fname = settings.get("shell.bash.interpreter", None)
         if fname:
             # use configured interpreter
-            cls.shell = f"\"{sublime.expand_variables(fname, os.environ)}\""
+            cls.shell = sublime.expand_variables(fname, os.environ)
             return True
 
         if sublime.platform() != "windows":
@@ -64,164 +493,243 @@ class BashCompletionListener(sublime_aio.ViewEventListener):
             cls.shell = "bash"
             return True
 
-        # already know the shell
-        if cls.found_shell is None:
-            cls.found_shell = False
-
-            # search bash on various default paths
-            for fname in (
-                "$HOMEDRIVE\\cygwin64\\bin\\bash.exe",
-                "$HOMEDRIVE\\cygwin\\bin\\bash.exe",
-                "$HOMEDRIVE\\mingw64\\bin\\bash.exe",
-                "$HOMEDRIVE\\mingw\\bin\\bash.exe",
-                "$PROGRAMFILES\\Git\\bin\\bash.exe",
-                "$SYSTEMROOT\\System32\\bash.exe"  # uses WSL as last option
-            ):
-                fname = sublime.expand_variables(fname, os.environ)
-                if fname and os.path.exists(fname):
-                    cls.shell = f"\"{fname}\""
-                    cls.found_shell = True
-                    break
+        # use bash found on default paths
+        fname = find_windows_bash()
+        if fname:
+            cls.shell = fname
+            return True
 
-        return cls.found_shell
+        return False
 
     async def on_query_completions(self, prefix: str, locations: list[sublime.Point]):
+        # abort pending request, which is superseded by this one
+        if self.task and not self.task.done():
+            self.task.cancel()
+        self.task = asyncio.current_task()
+
         if not self.enabled:
             return None
 
         pt = locations[0]
-        selector = self.view.settings().get(
-            "shell.bash.completion_selector",
-            "source.shell - comment - string.quoted"
-        )
-        if not self.view.match_selector(pt, selector):
+        if not self.view.match_selector(pt, self.completion_selector):
             return None
 
         # get last shell word in front of caret (doesn't account for quotes)
         prefix = self.view.substr(sublime.Region(self.view.line(pt).begin(), pt))
-        tokens = re.split(r"(?<!\\)[|&<>()\s]", prefix)
+        tokens = WORD_SEPARATOR_RE.split(prefix)
         if tokens:
             prefix = tokens[-1]
 
+        # nothing to complete, e.g. after whitespace or operators
+        if not prefix:
+            return None
+
         # guess working directory
         file_name = self.view.file_name()
         cwd = Path(file_name).parent if file_name else None
 
-        coros = []
-
-        selector = self.view.settings().get(
-            "shell.bash.command_completion_selector",
-            "meta.function-call.identifier"
+        commands = self.view.match_selector(pt - 1, self.command_completion_selector)
+        # too short prefix would cause too many file results
+        files = len(prefix) > 1 and self.view.match_selector(
+            pt - 1, self.file_completion_selector
         )
-        if self.view.match_selector(pt - 1, selector):
-            coros.append(self.get_commands(cwd, prefix))
+        variables = self.view.match_selector(pt - 1, self.variable_completion_selector)
 
-        selector = self.view.settings().get(
-            "shell.bash.file_completion_selector",
-            "- meta.function-call.identifier"
+        commands, files, variables = await self.compgen(
+            cwd, prefix, commands, files, variables
         )
-        if self.view.match_selector(pt - 1, selector):
-            coros.append(self.get_files(cwd, prefix))
 
-        selector = self.view.settings().get(
-            "shell.bash.variable_completion_selector",
-            ""
+        # build all items here, rather than while ST iterates them on UI thread
+        return (
+            self.command_completions(commands)
+            + self.file_completions(files)
+            + self.variable_completions(variables, prefix)
         )
-        if self.view.match_selector(pt - 1, selector):
-            coros.append(self.get_variables(cwd, prefix))
 
-        return chain(*await asyncio.gather(*coros))
+    async def on_activated(self):
+        # pick up changed settings, e.g. after switching syntax or project
+        self.load_selectors()
 
-    async def get_commands(self, cwd: Path | None, prefix: str):
+    async def on_post_save(self):
         """
-        Gather all shell commands or globally available executables.
+        Drop cached outputs of the view's working directory,
+        as saving may have created new files.
         """
-        if not prefix:
-            # would cause too many results
-            return ()
+        file_name = self.view.file_name()
+        if not file_name:
+            return
+
+        cwd = Path(file_name).parent
+        for key in [key for key in OUTPUT_CACHE if key[1] == cwd]:
+            del OUTPUT_CACHE[key]
+
+    async def compgen(
+        self,
+        cwd: Path | None,
+        prefix: str,
+        commands: bool,
+        files: bool,
+        variables: bool
+    ) -> tuple[str | None, str | None, str | None]:
+        """
+        Gather commands, files and variables using a single shell invocation.
 
-        text = await self.check_output(f"compgen -c {prefix}", cwd)
+        :param cwd:
+            The current working directory.
+        :param prefix:
+            The shell word to complete.
+        :param commands:
+            Whether to gather shell commands or globally available executables.
+        :param files:
+            Whether to gather folders and files.
+        :param variables:
+            Whether to gather shell environment variables.
+
+        :returns:
+            A tuple of `compgen` outputs, with `None` for each skipped kind.
+        """
+        word = quote_word(prefix)
+
+        command_cmd = f"compgen -c -- {word}"
+        # limit files by builtins only, as external commands would have to be
+        # spawned per request, while read stops consuming compgen's output
+        file_cmd = (
+            f"__bc_n=0; while ((__bc_n++ < {MAX_FILES})) && IFS= read -r __bc_f; "
+            f"do printf '%s\\n' \"$__bc_f\"; done < <(compgen -f -- {word})"
+        )
+        variable_cmd = "compgen -v"
+
+        # small outputs first, as output truncated due to `OUTPUT_LIMIT`
+        # misses all sections following the truncated one
+        cmds = {}
+        if variables:
+            # variables don't depend on prefix, so they can be cached longer
+            cmds[variable_cmd] = 30.0
+        if commands:
+            cmds[command_cmd] = 2.0
+        if files:
+            cmds[file_cmd] = 2.0
+
+        outputs = await self.check_output(cmds, cwd) if cmds else {}
+
+        return (
+            outputs.get(command_cmd),
+            outputs.get(file_cmd),
+            outputs.get(variable_cmd)
+        )
+
+    def command_completions(self, text: str | None):
+        """
+        Create completions for shell commands or globally available executables.
+        """
         if not text:
             # got nothing, skip!
-            return ()
+            return []
 
-        file_kind = [sublime.KindId.FUNCTION, "f", "command"]
-        return (
+        return [
             sublime.CompletionItem(
                 trigger=word,
-                kind=file_kind,
+                kind=COMMAND_KIND,
                 details="shell command"
             )
-            for word in set(text.splitlines()) - KNOWN_COMPLETIONS
-        )
+            for word in new_words(text)
+        ]
 
-    async def get_files(self, cwd: Path | None, prefix: str):
+    def file_completions(self, text: str | None):
         """
-        Gather folders and files.
+        Create completions for folders and files.
         """
-        text = await self.check_output(f"compgen -f {prefix}", cwd)
         if not text:
-            return ()
+            return []
 
-        file_kind = [sublime.KindId.NAMESPACE, "f", "filesystem"]
-        return (
+        return [
             sublime.CompletionItem(
                 trigger=word,
-                kind=file_kind,
+                kind=FILE_KIND,
                 details="folder or file"
             )
-            for word in set(text.splitlines()) - KNOWN_COMPLETIONS
-        )
+            for word in new_words(text)
+        ]
 
-    async def get_variables(self, cwd: Path | None, prefix: str):
+    def variable_completions(self, text: str | None, prefix: str):
         """
-        Gather all shell environment variables.
+        Create completions for shell environment variables.
         """
-        text = await self.check_output("compgen -v", cwd)
         if not text:
-            return ()
+            return []
 
         is_var = prefix and prefix[0] == "$"
 
-        file_kind = [sublime.KindId.VARIABLE, "v", "Variable"]
-        return (
+        return [
             sublime.CompletionItem(
                 trigger=word,
                 completion=word if is_var else f"${word}",
-                kind=file_kind,
+                kind=VARIABLE_KIND,
                 details="global environment variable"
             )
-            for word in set(text.splitlines()) - KNOWN_COMPLETIONS
-        )
+            for word in new_words(text)
+        ]
 
-    async def check_output(self, cmd: str, cwd: Path | None=None):
+    async def check_output(self, cmds: dict[str, float], cwd: Path | None=None):
         """
-        Run command in given login shell.
+        Run commands in given login shell.
 
-        :param cmd:
-            The command to run
+        All commands without valid cached output are run at once by a long-lived
+        shell. Outputs are cached per command and working directory.
+
+        :param cmds:
+            The commands to run, mapped to the number of seconds
+            their output remains valid in cache.
         :param cwd:
             The current working directory.
 
         :returns:
-            Output string from stdout on success or `None` otherwise.
+            A dictionary of commands and their output strings from stdout.
+            Commands which failed to run are missing.
         """
-        try:
-            proc = await asyncio.create_subprocess_shell(
-                cmd=f"{self.shell} -l -c \"{cmd}\"",
-                cwd=cwd,
-                stdout=asyncio.subprocess.PIPE,
-                startupinfo=self.startupinfo)
-
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10.0)
-            if proc.returncode == 0:
-                return str(stdout, "utf-8").strip()
+        outputs = {}
+        pending = []
+        now = time.monotonic()
+
+        for cmd in cmds:
+            key = (cmd, cwd)
+            entry = OUTPUT_CACHE.get(key)
+            if entry and now < entry[0]:
+                OUTPUT_CACHE.move_to_end(key)
+                outputs[cmd] = entry[1]
+            else:
+                pending.append(cmd)
+
+        if not pending:
+            return outputs
+
+        # share identical requests, which are still running
+        key = (tuple(pending), cwd)
+        task = INFLIGHT.get(key)
+        if task is None:
+            task = INFLIGHT[key] = asyncio.ensure_future(
+                run_commands(
+                    get_shell(self.shell, cwd, self.startupinfo),
+                    {cmd: cmds[cmd] for cmd in pending}
+                )
+            )
+            task.add_done_callback(lambda _: INFLIGHT.pop(key, None))
 
-        except asyncio.TimeoutError:
+        try:
+            # don't cancel request for other callers
+            outputs.update(await asyncio.shield(task))
+
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.TimeoutError,
+            BrokenPipeError,
+            ConnectionResetError
+        ):
             pass
 
-        except FileNotFoundError:
+        except OSError as e:
+            # interpreter or working directory missing or not accessible
             self.enabled = False
-            print("Bash not found, disabling completions!")
+            print(f"Failed to start bash ({e}), disabling completions!")
 
-        return None
+        return outputs